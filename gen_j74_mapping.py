@@ -48,29 +48,35 @@ New:
   • Hyperpop A/B presets (sequence + markov)
   • --genre hyperpop → prints a studio one-pager (BPM, modes, meters, voicings)
   • --doc: sidecar Markdown (realized chords via music21 + genre sheet)
+  • --num-reps N: N independent Markov walks in one batch, one mapping file each
 
 Tabs: 2 spaces
 """
 
 import argparse
+import functools
 import os
 from typing import Sequence
-import random
 import re
 import sys
-from dataclasses import dataclass
+from bisect import bisect_right
+from pathlib import Path
 from textwrap import dedent
-from typing import Dict, List, Sequence, Tuple, Optional
+from typing import Dict, List, Sequence, TextIO, Tuple, Optional
+
+import numpy as np
 
 # ──────────────────────────────────────────────────────────────────────────────
-# Optional music21 (only used if --doc or --key/--mode provided)
+# Optional music21 (imported on first use: --doc with --key/--mode)
 # ──────────────────────────────────────────────────────────────────────────────
-try:
-  from music21 import key as m21key
-  from music21 import roman as m21roman
-except Exception:
-  m21key = None
-  m21roman = None
+@functools.cache
+def _music21():
+  try:
+    from music21 import key as m21key
+    from music21 import roman as m21roman
+    return m21key, m21roman
+  except Exception:
+    return None, None
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Modes (validation only; mapping remains row = scale degree 1..7)
@@ -165,77 +171,77 @@ MARKOV_PRESETS: Dict[str, Dict[str, Dict[str, float]]] = {
 # Degree syntax + parser (mini-DSL)
 # ──────────────────────────────────────────────────────────────────────────────
 
+# Kept for external callers; validation below uses _is_valid_degree
 ROMAN_RE = re.compile(r"^[b#]*[ivIV]+(?:°)?$")
 
 def _strip_accidentals(deg: str) -> str:
-  return re.sub(r"^[b#]+", "", deg)
+  # plain scan beats the regex engine on 1–3 char degrees
+  i = 0
+  while i < len(deg) and deg[i] in "b#":
+    i += 1
+  return deg[i:]
 
+_ROMAN_TO_ROW = {"I":1, "II":2, "III":3, "IV":4, "V":5, "VI":6, "VII":7}
+
+@functools.lru_cache(maxsize=None)
 def _roman_to_row(deg: str) -> int:
-  core = _strip_accidentals(deg)
-  up = core.upper().rstrip("°")
-  mapping = {"I":1, "II":2, "III":3, "IV":4, "V":5, "VI":6, "VII":7}
-  if up not in mapping:
-    raise ValueError(f"Unrecognized degree: {deg}")
-  return mapping[up]
+  up = _strip_accidentals(deg).upper().rstrip("°")
+  try:
+    return _ROMAN_TO_ROW[up]
+  except KeyError:
+    raise ValueError(f"Unrecognized degree: {deg}") from None
 
-def _is_in_mode(deg: str, mode_name: str) -> bool:
-  core = _strip_accidentals(deg)
-  mode_set = {_strip_accidentals(x) for x in MODE_TABLE[mode_name]}
-  return core in mode_set
+_VALID_CORES = frozenset(_ROMAN_TO_ROW)
 
-TOK = re.compile(r"\s*([(),*-])\s*")
+def _is_valid_degree(s: str) -> bool:
+  return s.lstrip("b#").removesuffix("°").upper() in _VALID_CORES
+
+_MODE_SETS: Dict[str, frozenset[str]] = {
+  name: frozenset(_strip_accidentals(x) for x in degs) for name, degs in MODE_TABLE.items()
+}
+
+# One token per punctuation mark or whitespace-free run; whitespace is skipped
+_TOK_ALL = re.compile(r"[(),*\-]|[^\s(),*\-]+")
 
 def _tokenize(s: str) -> List[str]:
-  out, i, buf = [], 0, ""
-  while i < len(s):
-    m = TOK.match(s, i)
-    if m:
-      if buf.strip():
-        out.append(buf.strip())
-        buf = ""
-      out.append(m.group(1))
-      i = m.end()
-    else:
-      buf += s[i]
-      i += 1
-  if buf.strip():
-    out.append(buf.strip())
-  return [("," if t == "-" else t) for t in out]
-
-@dataclass
-class Parser:
-  toks: List[str]
-  i: int = 0
-  def peek(self): return self.toks[self.i] if self.i < len(self.toks) else None
-  def eat(self, val=None):
-    t = self.peek()
-    if t is None: raise ValueError("Unexpected end of input.")
-    if val is not None and t != val: raise ValueError(f"Expected '{val}', got '{t}'.")
-    self.i += 1
-    return t
-  def parse_expr(self) -> List[str]:
-    cols = []; cols.extend(self.parse_column())
-    while self.peek() == ",": self.eat(","); cols.extend(self.parse_column())
-    return cols
-  def parse_column(self) -> List[str]:
-    items = []; items.extend(self.parse_item())
-    while self.peek() not in (None, ",", ")"): items.extend(self.parse_item())
-    return items
-  def parse_item(self) -> List[str]:
-    atom = self.parse_atom_or_group()
-    if self.peek() == "*":
-      self.eat("*"); n = int(self.eat()); atom = atom * n
-    return atom
-  def parse_atom_or_group(self) -> List[str]:
-    t = self.peek()
+  return [("," if t == "-" else t) for t in _TOK_ALL.findall(s)]
+
+def _parse_tokens(toks: List[str]) -> List[str]:
+  """
+  Flatten DSL tokens into one degree list without recursion.
+  '(' saves len(out) on a stack; ')' pops it, so a trailing '*n' can
+  repeat out[saved:] in place. ',' only separates columns.
+  """
+  out: List[str] = []
+  stack: List[int] = []
+  i, n = 0, len(toks)
+  need_item = True
+  while i < n:
+    t = toks[i]; i += 1
     if t == "(":
-      self.eat("("); inside = self.parse_expr(); self.eat(")"); return inside
-    tok = self.eat()
-    if not ROMAN_RE.match(tok): raise ValueError(f"Not a degree token: {tok}")
-    return [tok]
+      stack.append(len(out)); need_item = True
+      continue
+    if t == ",":
+      if need_item: raise ValueError("Not a degree token: ,")
+      need_item = True
+      continue
+    if t == ")":
+      if need_item: raise ValueError("Not a degree token: )")
+      if not stack: raise ValueError("Unexpected ')'.")
+      saved = stack.pop()
+    else:
+      if not _is_valid_degree(t): raise ValueError(f"Not a degree token: {t}")
+      saved = len(out); out.append(t)
+    need_item = False
+    if i < n and toks[i] == "*":
+      if i + 1 >= n: raise ValueError("Unexpected end of input.")
+      reps = int(toks[i + 1]); i += 2
+      out[saved:] = out[saved:] * reps
+  if stack or need_item: raise ValueError("Unexpected end of input.")
+  return out
 
 def parse_progression(spec: str) -> List[str]:
-  return Parser(_tokenize(spec)).parse_expr()
+  return _parse_tokens(_tokenize(spec))
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Preset helpers + TRUE Markov chain
@@ -246,37 +252,108 @@ def make_preset(name: str, length: int) -> List[str]:
   if name not in PRESET_DEGREES:
     raise ValueError(f"Unknown preset '{name}'. Try one of: {', '.join(sorted(PRESET_DEGREES))}.")
   base = PRESET_DEGREES[name]
-  out: List[str] = []
-  while len(out) < length:
-    out.extend(base)
-  return out[:length]
-
-def normalize_row(row: Dict[str, float]) -> Dict[str, float]:
-  s = float(sum(row.values()))
-  if s <= 0: raise ValueError("Markov row has non-positive sum.")
-  return {k: v/s for k, v in row.items()}
+  k = (length + len(base) - 1) // len(base)
+  return (base * k)[:length]
+
+def _prepare_transitions(trans: Dict[str, Dict[str, float]],
+                         start: Optional[str] = None) -> Tuple[List[str], np.ndarray]:
+  """Index states 0..N-1 and return (states, cum_P) with normalized, row-cumulative probs."""
+  states = list(trans)
+  index = {s: i for i, s in enumerate(states)}
+  for nexts in trans.values():
+    for s in nexts:
+      if s not in index:
+        index[s] = len(states); states.append(s)
+  if start is not None and start not in index:
+    index[start] = len(states); states.append(start)
+  n = len(states)
+  cum_P = np.zeros((n, n))
+  for state, nexts in trans.items():
+    i = index[state]
+    for nxt, p in nexts.items():
+      cum_P[i, index[nxt]] = p
+  # Validate and normalize every row in one pass
+  k = len(trans)
+  sums = cum_P[:k].sum(axis=1, keepdims=True)
+  bad = np.flatnonzero(sums[:, 0] <= 0)
+  if bad.size:
+    raise ValueError(f"Markov row '{states[bad[0]]}' has non-positive sum.")
+  cum_P[:k] /= sums
+  # Dead-end states (no outgoing row) restart from the first state
+  cum_P[k:] = cum_P[0]
+  np.cumsum(cum_P, axis=1, out=cum_P)
+  cum_P /= cum_P[:, -1:]  # end each row at exactly 1.0 so float drift can't strand a draw
+  return states, cum_P
+
+def _walk_njit(cum_P: np.ndarray, u: np.ndarray, start: int) -> np.ndarray:
+  out = np.empty(len(u) + 1, np.int64)
+  out[0] = start
+  s = start
+  for i in range(len(u)):
+    s = np.searchsorted(cum_P[s], u[i], side="right")
+    out[i + 1] = s
+  return out
+
+def _walk_bisect(cum_P: np.ndarray, u: np.ndarray, start: int) -> List[int]:
+  # Without numba, bisect on plain lists beats a per-step np.searchsorted call
+  rows = cum_P.tolist()
+  out = [start]
+  s = start
+  for x in u.tolist():
+    s = bisect_right(rows[s], x)
+    out.append(s)
+  return out
+
+# numba costs ~0.3 s up front (import + cached-kernel load) while bisect runs
+# ~0.115 s per million steps; measured: 1M 0.11 vs 0.29 s, 2M 0.23 vs 0.30 s,
+# 4M 0.46 vs 0.37 s (bisect vs warm-cache numba). Break-even is ~3M steps.
+_JIT_MIN_STEPS = 3_000_000
+
+@functools.cache
+def _markov_walk():
+  """Optional numba JIT of the walk (imported on first Markov run); bisect loop otherwise."""
+  try:
+    from numba import njit
+  except ImportError:
+    return _walk_bisect
+  return njit(cache=True)(_walk_njit)
 
 def markov_generate(trans: Dict[str, Dict[str, float]],
                     length: int,
                     start: Optional[str] = None,
-                    seed: Optional[int] = None) -> List[str]:
-  if seed is not None: random.seed(seed)
-  probs = {state: normalize_row(nexts) for state, nexts in trans.items()}
-  states = list(probs.keys())
-  if start is None:
-    start = states[0]
-  seq = [start]
-  cur = start
-  for _ in range(length - 1):
-    nexts = probs.get(cur)
-    if not nexts:
-      cur = states[0]
-      nexts = probs[cur]
-    choices = list(nexts.keys())
-    weights = list(nexts.values())
-    cur = random.choices(choices, weights, k=1)[0]
-    seq.append(cur)
-  return seq
+                    seed: Optional[int] = None,
+                    rng: Optional[np.random.Generator] = None) -> List[str]:
+  # Local generator only: never touch global RNG state. A caller-supplied
+  # rng (e.g. shared across walks) takes precedence over seed.
+  if rng is None:
+    rng = np.random.default_rng(seed)
+  states, cum_P = _prepare_transitions(trans, start)
+  s0 = 0 if start is None else states.index(start)
+  u = rng.random(max(length - 1, 0))
+  walk = _markov_walk() if len(u) >= _JIT_MIN_STEPS else _walk_bisect
+  return [states[i] for i in walk(cum_P, u, s0)]
+
+def markov_simulate(trans: Dict[str, Dict[str, float]],
+                    length: int,
+                    num_reps: int,
+                    start: Optional[str] = None,
+                    seed: Optional[int] = None,
+                    rng: Optional[np.random.Generator] = None) -> List[List[str]]:
+  """Run num_reps independent walks at once; one vectorized step per position."""
+  if rng is None:
+    rng = np.random.default_rng(seed)
+  states, cum_P = _prepare_transitions(trans, start)
+  s0 = 0 if start is None else states.index(start)
+  steps = max(length - 1, 0)
+  out = np.empty((num_reps, steps + 1), np.int64)
+  out[:, 0] = s0
+  u = rng.random((num_reps, steps))
+  state = out[:, 0]
+  for t in range(steps):
+    # searchsorted(side="right") for every chain: count bins <= u
+    state = (cum_P[state] <= u[:, t, None]).sum(axis=1)
+    out[:, t + 1] = state
+  return [[states[i] for i in row] for row in out.tolist()]
 
 def parse_markov_inline(spec: str) -> Dict[str, Dict[str, float]]:
   """
@@ -284,20 +361,26 @@ def parse_markov_inline(spec: str) -> Dict[str, Dict[str, float]]:
     "I:ii=0.3,V=0.7; ii:V=1.0; V:I=0.6,vi=0.4"
   """
   graph: Dict[str, Dict[str, float]] = {}
-  for clause in [c.strip() for c in spec.split(";") if c.strip()]:
-    if ":" not in clause:
+  for clause in spec.split(";"):
+    clause = clause.strip()
+    if not clause:
+      continue
+    state, sep, rhs = clause.partition(":")
+    if not sep:
       raise ValueError(f"Bad clause '{clause}'. Use STATE:n1=p1,n2=p2 …")
-    state, rhs = clause.split(":", 1)
     state = state.strip()
-    if not ROMAN_RE.match(state):
+    if not _is_valid_degree(state):
       raise ValueError(f"Bad state '{state}'.")
     nxt: Dict[str, float] = {}
-    for pair in [p.strip() for p in rhs.split(",") if p.strip()]:
-      if "=" not in pair:
+    for pair in rhs.split(","):
+      pair = pair.strip()
+      if not pair:
+        continue
+      nxt_state, sep, prob = pair.partition("=")
+      if not sep:
         raise ValueError(f"Bad pair '{pair}'. Use NEXT=PROB")
-      nxt_state, prob = pair.split("=", 1)
       nxt_state = nxt_state.strip()
-      if not ROMAN_RE.match(nxt_state):
+      if not _is_valid_degree(nxt_state):
         raise ValueError(f"Bad next state '{nxt_state}'.")
       nxt[nxt_state] = float(prob)
     graph[state] = nxt
@@ -318,8 +401,11 @@ SECTION_LABELS = {
   'custom2':  ['Custom2 Triads','Custom2 7th','Custom2 >>9','Custom2 >>11','Custom2 >>13'],
 }
 
+_SECTION_TENS = {'diatonic':0, 'custom1':1, 'custom2':2}
+
 def slot_id(quality_idx: int, section: str, col0: int, row1: int) -> int:
-  tens = {'diatonic':0, 'custom1':1, 'custom2':2}[section]
+  # Plain arithmetic, so col0/row1 may also be NumPy arrays (emit_section relies on it)
+  tens = _SECTION_TENS[section]
   ones = col0 + 1   # 1..5
   hundreds = quality_idx  # 1..5
   return hundreds*100 + tens*10 + ones*10 + row1
@@ -336,29 +422,40 @@ def emit_section(section: str,
                  cols: Sequence[str],
                  start_note: int,
                  row_step: int,
-                 lane_offsets: Dict[str, int]) -> List[str]:
-  lines = []
+                 lane_offsets: Dict[str, int],
+                 out_fp: TextIO) -> None:
+  rows = np.fromiter((_roman_to_row(d) for d in cols[:5]), dtype=np.int64)  # 5 columns per section
+  col0s = np.arange(len(rows))
+  row_offsets = (rows - 1) * row_step
   for q in range(1, 6):
-    lines.append(f"// {SECTION_LABELS[section][q-1]}")
+    out_fp.write(f"// {SECTION_LABELS[section][q-1]}\n")
     lane_base = start_note + int(lane_offsets.get(str(q), 0))
-    for col0, deg in enumerate(cols[:5]):  # 5 columns per section
-      row = _roman_to_row(deg)
-      sid = slot_id(q, section, col0, row)
-      midi = lane_base + (row - 1) * row_step
-      lines.append(f" {sid} {midi}")
-  lines.append("// ******************************************************")
-  return lines
-
-def emit_mapping_sectioned(section_to_cols: Dict[str, List[str]],
+    sids = slot_id(q, section, col0s, rows)
+    midis = lane_base + row_offsets
+    out_fp.writelines([f" {sid} {midi}\n" for sid, midi in zip(sids.tolist(), midis.tolist())])
+  out_fp.write("// ******************************************************\n")
+
+def _section_columns(section_to_cols: Dict[str, List[str]],
+                     sections: Sequence[str]) -> List[Tuple[str, List[str]]]:
+  """Cycle each section to five columns; raises ValueError on an unrecognized degree."""
+  sec_cols = [(sec, _cycle_to_five(section_to_cols.get(sec, []))) for sec in sections]
+  for _, cols in sec_cols:
+    for deg in cols[:5]:
+      _roman_to_row(deg)
+  return sec_cols
+
+def emit_mapping_sectioned(path: str | Path,
+                           section_to_cols: Dict[str, List[str]],
                            start_note: int,
                            row_step: int,
                            lane_offsets: Dict[str, int],
-                           sections: Sequence[str]) -> str:
-  out = [HEADER]
-  for sec in sections:
-    cols = _cycle_to_five(section_to_cols.get(sec, []))
-    out.extend(emit_section(sec, cols, start_note, row_step, lane_offsets))
-  return "\n".join(out).rstrip() + "\n"
+                           sections: Sequence[str]) -> None:
+  # Resolve every degree before opening, so a bad one never leaves a half-written map
+  sec_cols = _section_columns(section_to_cols, sections)
+  with open(path, "w", encoding="utf-8") as f:
+    f.write(HEADER + "\n")
+    for sec, cols in sec_cols:
+      emit_section(sec, cols, start_note, row_step, lane_offsets, f)
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Genre one-pager (Hyperpop) + docs
@@ -398,6 +495,7 @@ GENRE_SHEETS: Dict[str, Dict[str, str | List[str]]] = {
 
 def realize_chords_md(deg_by_col: Sequence[str], key_name: str, mode_name: str) -> str:
   # (same robust version you just fixed: Key(key, mode) not f"{key} {mode}")
+  m21key, m21roman = _music21()
   if m21key is None or m21roman is None:
     return ""
   mode_to_quality = {
@@ -423,11 +521,12 @@ def realize_chords_md(deg_by_col: Sequence[str], key_name: str, mode_name: str)
       lines.append(f"| {i} | {deg} | (n/a) | (n/a) | (n/a) |")
   return "\n".join(lines) + "\n"
 
+@functools.lru_cache(maxsize=8)
 def load_curated_markdown(path: str) -> str:
-  if not os.path.exists(path):
-    raise FileNotFoundError(f"Curated genre source not found: {path}")
-  with open(path, "r", encoding="utf-8") as f:
-    return f.read()
+  try:
+    return Path(path).read_text(encoding="utf-8")
+  except FileNotFoundError:
+    raise FileNotFoundError(f"Curated genre source not found: {path}") from None
 
 def build_sidecar_from_curated(curated_md: str,
                                degs_for_chords: Sequence[str],
@@ -451,6 +550,7 @@ def build_sidecar_from_curated(curated_md: str,
 
   return curated_md.replace("{{CHORD_TABLE}}", chord_table)
 
+@functools.lru_cache(maxsize=8)
 def genre_sheet_md(genre: str) -> str:
   g = GENRE_SHEETS.get(genre.lower())
   if not g:
@@ -481,8 +581,7 @@ def genre_sheet_md(genre: str) -> str:
     lines.append("\n---\n")
     lines.append(f"_Source notes from `{src_path}`:_\n")
     try:
-      with open(src_path, "r", encoding="utf-8") as f:
-        lines.append(f.read().strip())
+      lines.append(Path(src_path).read_text(encoding="utf-8").strip())
     except Exception as e:
       lines.append(f"> (Could not read source file: {e})")
   return "\n".join(lines).strip() + "\n"
@@ -506,6 +605,9 @@ def build_parser() -> argparse.ArgumentParser:
     # TRUE Markov preset with seed
     gen_j74_mapping.py --markov-preset hyperpop_b --length 15 --seed 42 -o hpb_walk.txt
 
+    # 8 independent walks in one pass → hpb_walk_1.txt … hpb_walk_8.txt
+    gen_j74_mapping.py --markov-preset hyperpop_b --length 15 --num-reps 8 -o hpb_walk.txt
+
     # Inline Markov transitions
     gen_j74_mapping.py --markov "I:V=0.5,vi=0.5; V:vi=0.6,IV=0.4; vi:IV=1.0" --length 12 -o mwalk.txt
 
@@ -555,6 +657,9 @@ def build_parser() -> argparse.ArgumentParser:
                  help="Length for --markov sources (default 10)")
   p.add_argument('-s',  "--seed", type=int,
                  help="Seed for Markov RNG")
+  p.add_argument('-n',  "--num-reps", type=int, default=1,
+                 help="Independent Markov walks to generate (default 1). "
+                      "N > 1 writes one file per walk: <outfile>_<k><ext>; --doc uses the first.")
   p.add_argument('-ab', "--allow-borrowed", action="store_true",
                  help="Permit degrees outside the mode (leading b/# or not present in the mode).")
   p.add_argument('-bc', "--borrowed-to-custom",
@@ -589,59 +694,31 @@ def _split_borrowing(seq: List[str], mode: Optional[str]) -> Tuple[List[str], Li
   """Return (in_mode, borrowed) based on mode + accidentals."""
   if not seq:
     return [], []
-  if not mode:
-    # Without a mode, treat explicit accidentals as 'borrowed'
-    in_mode = [d for d in seq if not re.match(r"^[b#]+", d)]
-    borrowed = [d for d in seq if re.match(r"^[b#]+", d)]
-    return in_mode, borrowed
   in_mode, borrowed = [], []
+  # Without a mode, only explicit accidentals count as 'borrowed'
+  mode_set = _MODE_SETS[mode] if mode else None
   for d in seq:
-    core_ok = _is_in_mode(d, mode)
-    acc = bool(re.match(r"^[b#]+", d))
-    if core_ok and not acc:
-      in_mode.append(d)
-    else:
-      borrowed.append(d)
+    # d has no accidental once the first test fails, so it is its own core
+    is_borrowed = d[:1] in ("b", "#") or (mode_set is not None and d not in mode_set)
+    (borrowed if is_borrowed else in_mode).append(d)
   return in_mode, borrowed
 
-def main(argv: Sequence[str] | None = None) -> int:
-  parser = build_parser()
-  args = parser.parse_args(argv)
-
-  lane_offsets = {"1":0, "2":1, "3":2, "4":3, "5":8}
-  for spec in args.lane:
-    try:
-      k, v = spec.split(":")
-      lane_offsets[k.strip()] = int(v.strip())
-    except Exception:
-      parser.error(f"Bad --lane spec '{spec}'. Use like: --lane 3:2")
-
-  # Build unbounded degree sequence
-  if args.prog:
-    deg_seq = parse_progression(args.prog)
-  elif args.preset:
-    deg_seq = make_preset(args.preset, args.repeat)
-  elif args.markov_preset:
-    trans = MARKOV_PRESETS[args.markov_preset]
-    deg_seq = markov_generate(trans, length=args.length, seed=args.seed)
-  else:
-    trans = parse_markov_inline(args.markov)
-    start_state = next(iter(trans.keys()))
-    deg_seq = markov_generate(trans, length=args.length, start=start_state, seed=args.seed)
-
-  # Borrowed routing logic
-  sections = ["diatonic","custom1","custom2"] if args.mirror == "all" else [args.mirror]
+def _route_sections(deg_seq: List[str],
+                    sections: Sequence[str],
+                    borrowed_to_custom: Optional[str],
+                    mode: Optional[str],
+                    allow_borrowed: bool) -> Dict[str, List[str]]:
+  """Map each emitted section to its degree columns (borrowed routing applied)."""
   section_to_cols: Dict[str, List[str]] = {}
-  if args.borrowed_to_custom:
+  if borrowed_to_custom:
     # Split degrees into in-mode vs borrowed
-    in_mode, borrowed = _split_borrowing(deg_seq, args.mode)
-    if args.mode and not args.allow_borrowed and borrowed:
-      parser.error("Borrowed degrees present but --allow-borrowed not set. "
-                   "Pass --allow-borrowed or remove borrowed degrees.")
-      return 2
+    in_mode, borrowed = _split_borrowing(deg_seq, mode)
+    if mode and not allow_borrowed and borrowed:
+      raise ValueError("Borrowed degrees present but --allow-borrowed not set. "
+                       "Pass --allow-borrowed or remove borrowed degrees.")
     # Fill Diatonic with in-mode, route borrowed to chosen custom grid
     section_to_cols["diatonic"] = _cycle_to_five(in_mode) if "diatonic" in sections else []
-    target = args.borrowed_to_custom
+    target = borrowed_to_custom
     other = "custom1" if target == "custom2" else "custom2"
     if target in sections:
       section_to_cols[target] = _cycle_to_five(borrowed if borrowed else in_mode)
@@ -652,56 +729,112 @@ def main(argv: Sequence[str] | None = None) -> int:
     # No routing: use the same sequence everywhere (cycled/truncated later)
     for s in sections:
       section_to_cols[s] = list(deg_seq)
+  return section_to_cols
 
-  # Emit mapping text
+def _rep_outfile(outfile: str, rep: int, num_reps: int) -> str:
+  root, ext = os.path.splitext(outfile)
+  return f"{root}_{rep:0{len(str(num_reps))}d}{ext}"
+
+def main(argv: Sequence[str] | None = None) -> int:
+  parser = build_parser()
+  args = parser.parse_args(argv)
+
+  lane_offsets = {"1":0, "2":1, "3":2, "4":3, "5":8}
+  for spec in args.lane:
+    try:
+      k, v = spec.split(":")
+      lane_offsets[k.strip()] = int(v.strip())
+    except Exception:
+      parser.error(f"Bad --lane spec '{spec}'. Use like: --lane 3:2")
+
+  if args.num_reps < 1:
+    parser.error("--num-reps must be at least 1.")
+  if args.num_reps > 1 and not (args.markov_preset or args.markov):
+    parser.error("--num-reps only applies to --markov-preset/--markov.")
+
+  # Build unbounded degree sequence(s); Markov walks run as one batch
   try:
-    text = emit_mapping_sectioned(
-      section_to_cols=section_to_cols,
-      start_note=args.start_note,
-      row_step=args.row_step,
-      lane_offsets=lane_offsets,
-      sections=sections
-    )
+    if args.prog:
+      deg_seqs = [parse_progression(args.prog)]
+    elif args.preset:
+      deg_seqs = [make_preset(args.preset, args.repeat)]
+    else:
+      if args.markov_preset:
+        trans, start_state = MARKOV_PRESETS[args.markov_preset], None
+      else:
+        trans = parse_markov_inline(args.markov)
+        start_state = next(iter(trans.keys()))
+      if args.num_reps == 1:
+        deg_seqs = [markov_generate(trans, length=args.length, start=start_state, seed=args.seed)]
+      else:
+        deg_seqs = markov_simulate(trans, length=args.length, num_reps=args.num_reps,
+                                   start=start_state, seed=args.seed)
   except ValueError as e:
     parser.error(str(e))
     return 2
 
-  with open(args.outpath + '/' +args.outfile, "w", encoding="utf-8") as f:
-    f.write(text)
-  print(f"Wrote {args.outfile}")
-
- if args.doc:
-  if not args.genre:
-    parser.error("--doc requires --genre (so we know which curated file to load).")
-    return 2
-
-  genre_src = args.genre_src or os.path.join("genres", f"{args.genre.lower()}-source-information.md")
+  sections = ["diatonic","custom1","custom2"] if args.mirror == "all" else [args.mirror]
+  out_dir = Path(args.outpath)
+  # Route every walk and resolve its degrees before any output is touched
   try:
-    curated_md = load_curated_markdown(genre_src)
-  except FileNotFoundError as e:
-    parser.error(str(e) + "  (Create this file; the sidecar is curated-only by design.)")
+    routed = [_route_sections(deg_seq, sections, args.borrowed_to_custom,
+                              args.mode, args.allow_borrowed)
+              for deg_seq in deg_seqs]
+    for section_to_cols in routed:
+      _section_columns(section_to_cols, sections)
+  except ValueError as e:
+    parser.error(str(e))
     return 2
 
-  # Pick 5 visible columns for chord table (if placeholder present)
-  # Prefer diatonic section if present
-  chosen_cols = None
-  for choice in ["diatonic"] + [s for s in sections if s != "diatonic"]:
-    cols = section_to_cols.get(choice, [])
-    if cols:
-      chosen_cols = _cycle_to_five(cols)
-      break
-  if chosen_cols is None:
-    chosen_cols = ["I","V","vi","IV","ii"]  # safe fallback
-
-  doc_text = build_sidecar_from_curated(
-    curated_md=curated_md,
-    degs_for_chords=chosen_cols,
-    key_name=args.key,
-    mode_name=args.mode
-  )
-  with open(args.outpath + '/' + args.doc, "w", encoding="utf-8") as f:
-    f.write(doc_text)
-  print(f"Wrote {args.doc} (from curated: {genre_src})")
+  if args.doc:
+    if not args.genre:
+      parser.error("--doc requires --genre (so we know which curated file to load).")
+      return 2
+
+    genre_src = args.genre_src or os.path.join("genres", f"{args.genre.lower()}-source-information.md")
+    try:
+      curated_md = load_curated_markdown(genre_src)
+    except FileNotFoundError as e:
+      parser.error(str(e) + "  (Create this file; the sidecar is curated-only by design.)")
+      return 2
+
+  for rep, section_to_cols in enumerate(routed, 1):
+    outfile = args.outfile if args.num_reps == 1 else _rep_outfile(args.outfile, rep, args.num_reps)
+    out_path = out_dir / outfile
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    # Stream mapping straight to the output file
+    emit_mapping_sectioned(
+      path=out_path,
+      section_to_cols=section_to_cols,
+      start_note=args.start_note,
+      row_step=args.row_step,
+      lane_offsets=lane_offsets,
+      sections=sections
+    )
+    print(f"Wrote {outfile}")
+
+  if args.doc:
+    # Pick 5 visible columns for chord table (if placeholder present)
+    # Prefer diatonic section if present
+    chosen_cols = None
+    for choice in ["diatonic"] + [s for s in sections if s != "diatonic"]:
+      cols = routed[0].get(choice, [])
+      if cols:
+        chosen_cols = _cycle_to_five(cols)
+        break
+    if chosen_cols is None:
+      chosen_cols = ["I","V","vi","IV","ii"]  # safe fallback
+
+    doc_text = build_sidecar_from_curated(
+      curated_md=curated_md,
+      degs_for_chords=chosen_cols,
+      key_name=args.key,
+      mode_name=args.mode
+    )
+    doc_path = out_dir / args.doc
+    doc_path.parent.mkdir(parents=True, exist_ok=True)
+    doc_path.write_text(doc_text, encoding="utf-8")
+    print(f"Wrote {args.doc} (from curated: {genre_src})")
 
 if __name__ == "__main__":
   sys.exit(main())